@@ -1,6 +1,12 @@
 "use client";
 
 import { useCallback, useEffect, useMemo, useRef, useState } from "react";
+import {
+  decodeBinaryFrame,
+  serializeClientMessage,
+  type AudioInMessage,
+  type AudioOutFrame
+} from "@/lib/voice/audioFrame";
 import { ConnectionManager, type ConnectionState } from "@/lib/voice/connectionManager";
 import { transcribeAudioBlob } from "@/lib/voice/transcribeClient";
 import type { InterviewConfig } from "@/lib/schema/interview";
@@ -22,25 +28,13 @@ type VoiceClientMessage =
       topic: string;
       previous?: Array<{ question: string; answer: string }>;
     }
-  | {
-      type: "audio";
-      format: "pcm16";
-      sampleRate: number;
-      channels: 1;
-      data: string;
-    }
+  | AudioInMessage
   | { type: "end_utterance" }
   | { type: "reset" };
 
 type VoiceServerMessage =
   | { type: "ready" }
-  | {
-      type: "audio_out";
-      format: "pcm16";
-      sampleRate: number;
-      channels: 1;
-      data: string;
-    }
+  | AudioOutFrame
   | { type: "text_out"; text: string }
   | { type: "error"; message: string };
 
@@ -131,16 +125,6 @@ function resolveVoiceWsUrl() {
   return normalizeWsUrl(configured);
 }
 
-function base64ToInt16(base64: string) {
-  const binary = atob(base64);
-  const length = binary.length;
-  const bytes = new Uint8Array(length);
-  for (let i = 0; i < length; i += 1) {
-    bytes[i] = binary.charCodeAt(i);
-  }
-  return new Int16Array(bytes.buffer);
-}
-
 function downsampleTo16k(buffer: Float32Array, inputRate: number) {
   if (inputRate === 16000) return buffer;
   const ratio = inputRate / 16000;
@@ -164,19 +148,9 @@ function floatTo16BitPCM(float32: Float32Array) {
   return output;
 }
 
-function pcm16ToBase64(pcm: Int16Array) {
-  const bytes = new Uint8Array(pcm.buffer);
-  let binary = "";
-  for (let i = 0; i < bytes.length; i += 1) {
-    binary += String.fromCharCode(bytes[i]);
-  }
-  return btoa(binary);
-}
-
-function silenceChunkBase64(durationMs: number) {
+function silenceChunk(durationMs: number) {
   const sampleCount = Math.max(1, Math.round((16000 * durationMs) / 1000));
-  const pcm = new Int16Array(sampleCount);
-  return pcm16ToBase64(pcm);
+  return new Int16Array(sampleCount);
 }
 
 function buildFallbackCoachText(context: VoiceContext) {
@@ -394,7 +368,7 @@ export function useVoiceInterviewer({
         lastAudioOutAtRef.current = now;
         setLastCoachAudioAt(now);
         const sampleRate = Number(message.sampleRate || 16000);
-        const pcm = base64ToInt16(message.data);
+        const pcm = message.pcm;
         if (pcm.length > 0) {
           coachPcmChunksRef.current.push(pcm);
           coachSampleRateRef.current = sampleRate;
@@ -429,6 +403,8 @@ export function useVoiceInterviewer({
           jitterRatio: 0.3,
           heartbeatIntervalMs: 12000,
           deadConnectionMs: DEFAULT_DEAD_CONNECTION_MS,
+          serialize: serializeClientMessage,
+          parseBinary: (data) => decodeBinaryFrame<VoiceServerMessage>(data),
           createHeartbeatMessage: () => ({
             type: "hello",
             sessionId: sessionIdRef.current,
@@ -535,14 +511,13 @@ export function useVoiceInterviewer({
   const sendSilence = useCallback((totalMs: number) => {
     const chunkMs = 200;
     const chunks = Math.max(1, Math.ceil(totalMs / chunkMs));
-    const data = silenceChunkBase64(chunkMs);
+    const pcm = silenceChunk(chunkMs);
     for (let i = 0; i < chunks; i += 1) {
       managerRef.current?.send({
         type: "audio",
-        format: "pcm16",
         sampleRate: 16000,
         channels: 1,
-        data
+        pcm
       });
     }
     syncQueueSize();
@@ -704,13 +679,11 @@ export function useVoiceInterviewer({
       const input = event.inputBuffer.getChannelData(0);
       const downsampled = downsampleTo16k(input, ctx.sampleRate);
       const pcm16 = floatTo16BitPCM(downsampled);
-      const data = pcm16ToBase64(pcm16);
       managerRef.current?.send({
         type: "audio",
-        format: "pcm16",
         sampleRate: 16000,
         channels: 1,
-        data
+        pcm: pcm16
       });
     };
 
@@ -0,0 +1,68 @@
+export const AUDIO_OUT_FRAME = 0x01;
+export const AUDIO_IN_FRAME = 0x02;
+
+// type byte + uint32 sampleRate + uint16 channels (little-endian), then PCM16.
+const AUDIO_HEADER_BYTES = 7;
+
+export type AudioOutFrame = {
+  type: "audio_out";
+  sampleRate: number;
+  channels: number;
+  pcm: Int16Array;
+};
+
+export type AudioInMessage = {
+  type: "audio";
+  sampleRate: number;
+  channels: 1;
+  pcm: Int16Array;
+};
+
+export function encodeAudioInFrame(pcm: Int16Array, sampleRate: number, channels = 1) {
+  const buffer = new ArrayBuffer(AUDIO_HEADER_BYTES + pcm.byteLength);
+  const view = new DataView(buffer);
+  view.setUint8(0, AUDIO_IN_FRAME);
+  view.setUint32(1, sampleRate, true);
+  view.setUint16(5, channels, true);
+  new Uint8Array(buffer, AUDIO_HEADER_BYTES).set(
+    new Uint8Array(pcm.buffer, pcm.byteOffset, pcm.byteLength)
+  );
+  return buffer;
+}
+
+// Audio goes out as a binary frame; control messages stay JSON text.
+export function serializeClientMessage(
+  message: { type: string } | AudioInMessage
+): string | ArrayBuffer {
+  if (message.type === "audio" && "pcm" in message) {
+    const audio = message as AudioInMessage;
+    return encodeAudioInFrame(audio.pcm, audio.sampleRate, audio.channels);
+  }
+  return JSON.stringify(message);
+}
+
+export function decodeAudioOutFrame(buffer: ArrayBuffer): AudioOutFrame | null {
+  if (buffer.byteLength < AUDIO_HEADER_BYTES) return null;
+  const view = new DataView(buffer);
+  if (view.getUint8(0) !== AUDIO_OUT_FRAME) return null;
+
+  const sampleRate = view.getUint32(1, true);
+  const channels = view.getUint16(5, true);
+  const sampleCount = Math.floor((buffer.byteLength - AUDIO_HEADER_BYTES) / 2);
+  // PCM starts at an odd offset, so copy it out to get an aligned Int16Array.
+  const pcm = new Int16Array(
+    buffer.slice(AUDIO_HEADER_BYTES, AUDIO_HEADER_BYTES + sampleCount * 2)
+  );
+  return { type: "audio_out", sampleRate, channels, pcm };
+}
+
+const textDecoder = new TextDecoder();
+
+// Binary frames are either PCM (leading 0x01) or UTF-8 JSON, which never starts with 0x01.
+export function decodeBinaryFrame<T>(buffer: ArrayBuffer): AudioOutFrame | T | null {
+  if (buffer.byteLength === 0) return null;
+  if (new Uint8Array(buffer, 0, 1)[0] === AUDIO_OUT_FRAME) {
+    return decodeAudioOutFrame(buffer);
+  }
+  return JSON.parse(textDecoder.decode(buffer)) as T;
+}
@@ -7,11 +7,12 @@ export type ConnectionState =
 
 export type WebSocketLike = {
   readyState: number;
+  binaryType?: BinaryType;
   onopen: ((event: Event) => void) | null;
   onclose: ((event: CloseEvent) => void) | null;
   onerror: ((event: Event) => void) | null;
   onmessage: ((event: MessageEvent) => void) | null;
-  send: (data: string) => void;
+  send: (data: string | ArrayBuffer) => void;
   close: (code?: number, reason?: string) => void;
 };
 
@@ -23,8 +24,9 @@ type ConnectionManagerOptions<TSend, TReceive> = {
   heartbeatIntervalMs?: number;
   deadConnectionMs?: number;
   maxQueueSize?: number;
-  serialize?: (message: TSend) => string;
+  serialize?: (message: TSend) => string | ArrayBuffer;
   parse?: (raw: string) => TReceive | null;
+  parseBinary?: (data: ArrayBuffer) => TReceive | null;
   createSocket?: (url: string) => WebSocketLike;
   createHeartbeatMessage?: () => TSend | null;
   onStateChange?: (state: ConnectionState) => void;
@@ -59,8 +61,9 @@ export class ConnectionManager<TSend, TReceive> {
   private readonly heartbeatIntervalMs: number;
   private readonly deadConnectionMs: number;
   private readonly maxQueueSize: number;
-  private readonly serialize: (message: TSend) => string;
+  private readonly serialize: (message: TSend) => string | ArrayBuffer;
   private readonly parse: (raw: string) => TReceive | null;
+  private readonly parseBinary?: (data: ArrayBuffer) => TReceive | null;
   private readonly createSocket: (url: string) => WebSocketLike;
   private readonly createHeartbeatMessage?: () => TSend | null;
   private readonly onStateChange?: (state: ConnectionState) => void;
@@ -89,6 +92,7 @@ export class ConnectionManager<TSend, TReceive> {
     this.maxQueueSize = options.maxQueueSize ?? 300;
     this.serialize = options.serialize ?? ((value) => JSON.stringify(value));
     this.parse = options.parse ?? ((raw) => JSON.parse(raw) as TReceive);
+    this.parseBinary = options.parseBinary;
     this.createSocket = options.createSocket ?? ((value) => new WebSocket(value));
     this.createHeartbeatMessage = options.createHeartbeatMessage;
     this.onStateChange = options.onStateChange;
@@ -229,6 +233,16 @@ export class ConnectionManager<TSend, TReceive> {
     }
   }
 
+  private parseEvent(data: unknown): TReceive | null {
+    if (typeof data === "string") {
+      return data ? this.parse(data) : null;
+    }
+    if (data instanceof ArrayBuffer && this.parseBinary) {
+      return this.parseBinary(data);
+    }
+    return null;
+  }
+
   private flushQueue() {
     if (!this.socket || this.socket.readyState !== SOCKET_OPEN) return;
     while (this.queue.length > 0) {
@@ -250,6 +264,7 @@ export class ConnectionManager<TSend, TReceive> {
 
     try {
       const socket = this.createSocket(this.url);
+      socket.binaryType = "arraybuffer";
       this.socket = socket;
 
       socket.onopen = () => {
@@ -263,10 +278,8 @@ export class ConnectionManager<TSend, TReceive> {
 
       socket.onmessage = (event) => {
         this.lastMessageAt = Date.now();
-        const text = typeof event.data === "string" ? event.data : "";
-        if (!text) return;
         try {
-          const parsed = this.parse(text);
+          const parsed = this.parseEvent(event.data);
           if (!parsed) return;
           this.onMessage?.(parsed);
         } catch {
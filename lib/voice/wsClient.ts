@@ -1,3 +1,10 @@
+import {
+  decodeBinaryFrame,
+  serializeClientMessage,
+  type AudioInMessage,
+  type AudioOutFrame
+} from "@/lib/voice/audioFrame";
+
 export type VoiceClientMessage =
   | {
       type: "hello";
@@ -15,25 +22,13 @@ export type VoiceClientMessage =
       topic: string;
       previous?: Array<{ question: string; answer: string }>;
     }
-  | {
-      type: "audio";
-      format: "pcm16";
-      sampleRate: number;
-      channels: 1;
-      data: string;
-    }
+  | AudioInMessage
   | { type: "end_utterance" }
   | { type: "reset" };
 
 export type VoiceServerMessage =
   | { type: "ready" }
-  | {
-      type: "audio_out";
-      format: "pcm16";
-      sampleRate: number;
-      channels: 1;
-      data: string;
-    }
+  | AudioOutFrame
   | { type: "text_out"; text: string }
   | { type: "error"; message: string };
 
@@ -61,6 +56,7 @@ export class VoiceWsClient {
         return;
       }
       this.ws = new WebSocket(this.url);
+      this.ws.binaryType = "arraybuffer";
       this.ws.onopen = () => {
         this.events.onOpen?.();
         resolve();
@@ -74,7 +70,11 @@ export class VoiceWsClient {
       };
       this.ws.onmessage = (event) => {
         try {
-          const parsed = JSON.parse(event.data) as VoiceServerMessage;
+          const parsed =
+            event.data instanceof ArrayBuffer
+              ? decodeBinaryFrame<VoiceServerMessage>(event.data)
+              : (JSON.parse(event.data) as VoiceServerMessage);
+          if (!parsed) return;
           this.events.onMessage(parsed);
         } catch {
           this.events.onError("Invalid message from voice server.");
@@ -92,7 +92,7 @@ export class VoiceWsClient {
 
   send(message: VoiceClientMessage) {
     if (!this.ws || this.ws.readyState !== WebSocket.OPEN) return;
-    this.ws.send(JSON.stringify(message));
+    this.ws.send(serializeClientMessage(message));
   }
 
   isOpen() {
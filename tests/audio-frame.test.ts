@@ -0,0 +1,55 @@
+import test from "node:test";
+import assert from "node:assert/strict";
+import {
+  AUDIO_IN_FRAME,
+  AUDIO_OUT_FRAME,
+  decodeAudioOutFrame,
+  decodeBinaryFrame,
+  serializeClientMessage
+} from "../lib/voice/audioFrame";
+
+function buildFrame(sampleRate: number, channels: number, samples: number[]) {
+  const buffer = new ArrayBuffer(7 + samples.length * 2);
+  const view = new DataView(buffer);
+  view.setUint8(0, AUDIO_OUT_FRAME);
+  view.setUint32(1, sampleRate, true);
+  view.setUint16(5, channels, true);
+  samples.forEach((sample, index) => view.setInt16(7 + index * 2, sample, true));
+  return buffer;
+}
+
+test("audio frame decoder reads header and pcm payload", () => {
+  const frame = decodeAudioOutFrame(buildFrame(24000, 1, [0, 1200, -32768, 32767]));
+  assert.ok(frame);
+  assert.equal(frame.type, "audio_out");
+  assert.equal(frame.sampleRate, 24000);
+  assert.equal(frame.channels, 1);
+  assert.deepEqual(Array.from(frame.pcm), [0, 1200, -32768, 32767]);
+});
+
+test("audio frame decoder rejects truncated or unknown frames", () => {
+  assert.equal(decodeAudioOutFrame(new ArrayBuffer(3)), null);
+  const unknown = buildFrame(24000, 1, [1]);
+  new DataView(unknown).setUint8(0, 0x7f);
+  assert.equal(decodeAudioOutFrame(unknown), null);
+});
+
+test("binary frame decoder routes json payloads and audio frames", () => {
+  const json = new TextEncoder().encode('{"type":"text_out","text":"héllo"}');
+  assert.deepEqual(decodeBinaryFrame(json.buffer), { type: "text_out", text: "héllo" });
+  const audio = decodeBinaryFrame(buildFrame(16000, 1, [5]));
+  assert.ok(audio && (audio as { type: string }).type === "audio_out");
+  assert.equal(decodeBinaryFrame(new ArrayBuffer(0)), null);
+});
+
+test("client audio is serialized as a binary frame and control messages as json", () => {
+  const pcm = new Int16Array([0, -2, 300]);
+  const frame = serializeClientMessage({ type: "audio", sampleRate: 16000, channels: 1, pcm });
+  assert.ok(frame instanceof ArrayBuffer);
+  const view = new DataView(frame);
+  assert.equal(view.getUint8(0), AUDIO_IN_FRAME);
+  assert.equal(view.getUint32(1, true), 16000);
+  assert.equal(view.getUint16(5, true), 1);
+  assert.deepEqual(Array.from(new Int16Array(frame.slice(7))), [0, -2, 300]);
+  assert.equal(serializeClientMessage({ type: "reset" }), '{"type":"reset"}');
+});
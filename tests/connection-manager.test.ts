@@ -10,18 +10,19 @@ type TestMessage = { type: "hello" | "context"; value?: string };
 
 class FakeSocket implements WebSocketLike {
   readyState = 0;
+  binaryType?: BinaryType;
   onopen: ((event: Event) => void) | null = null;
   onclose: ((event: CloseEvent) => void) | null = null;
   onerror: ((event: Event) => void) | null = null;
   onmessage: ((event: MessageEvent) => void) | null = null;
-  sent: string[] = [];
+  sent: Array<string | ArrayBuffer> = [];
 
   open() {
     this.readyState = 1;
     this.onopen?.({} as Event);
   }
 
-  send(data: string) {
+  send(data: string | ArrayBuffer) {
     this.sent.push(data);
   }
 
@@ -83,3 +84,29 @@ test("connection manager transitions and flushes queued messages", async () => {
 
   manager.stop();
 });
+
+test("connection manager dispatches binary frames to parseBinary", () => {
+  const sockets: FakeSocket[] = [];
+  const received: Array<{ bytes: number }> = [];
+
+  const manager = new ConnectionManager<TestMessage, { bytes: number }>("ws://test", {
+    heartbeatIntervalMs: 100000,
+    deadConnectionMs: 200000,
+    createSocket: () => {
+      const socket = new FakeSocket();
+      sockets.push(socket);
+      return socket;
+    },
+    parseBinary: (data) => ({ bytes: data.byteLength }),
+    onMessage: (message) => received.push(message)
+  });
+
+  manager.start();
+  sockets[0].open();
+  assert.equal(sockets[0].binaryType, "arraybuffer");
+
+  sockets[0].onmessage?.({ data: new ArrayBuffer(12) } as MessageEvent);
+  assert.deepEqual(received, [{ bytes: 12 }]);
+
+  manager.stop();
+});
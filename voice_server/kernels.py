@@ -0,0 +1,100 @@
+import functools
+
+import numpy as np
+
+try:
+    from numba import njit, types
+except Exception:  # pragma: no cover - optional dependency
+    njit = None
+
+_PCM16_SCALE = np.float32(1.0 / 32768.0)
+
+
+# NumPy fallbacks: single ufunc passes writing into the caller's buffer.
+def _i16_to_f32_numpy(src: np.ndarray, dst: np.ndarray) -> None:
+    np.multiply(src, _PCM16_SCALE, out=dst, casting="unsafe")
+
+
+def _i16bytes_to_f32_numpy(src: np.ndarray, dst: np.ndarray) -> None:
+    # src is a uint8 view of little-endian PCM16; an odd trailing byte is ignored.
+    _i16_to_f32_numpy(src[: src.size - (src.size & 1)].view("<i2"), dst)
+
+
+@functools.lru_cache(maxsize=16)
+def _linear_grid(in_len: int, out_len: int) -> tuple[np.ndarray, np.ndarray]:
+    # Client packets have a fixed size, so steady-state streaming is one cache hit.
+    x_old = np.linspace(0, 1, in_len, endpoint=False)
+    x_new = np.linspace(0, 1, out_len, endpoint=False)
+    x_old.flags.writeable = False
+    x_new.flags.writeable = False
+    return x_old, x_new
+
+
+def _resample_linear_numpy(src: np.ndarray, dst: np.ndarray) -> None:
+    x_old, x_new = _linear_grid(src.size, dst.size)
+    dst[:] = np.interp(x_new, x_old, src)
+
+
+def _f32_to_i16_clip_numpy(src: np.ndarray, dst: np.ndarray) -> None:
+    # Scaling first and clipping in place needs one temporary instead of two.
+    scaled = np.multiply(src, np.float32(32767.0), dtype=np.float32)
+    np.clip(scaled, -32767.0, 32767.0, out=scaled)
+    np.copyto(dst, scaled, casting="unsafe")
+
+
+if njit is not None:
+
+    def _signatures(src_dtype, dst_dtype) -> list:
+        # Contiguous 1-D arrays; sources may be read-only np.frombuffer views.
+        dst = types.Array(dst_dtype, 1, "C")
+        return [
+            types.void(types.Array(src_dtype, 1, "C", readonly=readonly), dst)
+            for readonly in (False, True)
+        ]
+
+    # Eager signatures compile (or load from cache) at import, so the first audio
+    # packet of a session does not pay for JIT compilation.
+    _KERNEL_OPTIONS = dict(cache=True, fastmath=True, boundscheck=False)
+
+    @njit(_signatures(types.int16, types.float32), **_KERNEL_OPTIONS)
+    def i16_to_f32(src, dst):
+        for i in range(src.size):
+            dst[i] = np.float32(src[i]) * _PCM16_SCALE
+
+    @njit(_signatures(types.uint8, types.float32), **_KERNEL_OPTIONS)
+    def i16bytes_to_f32(src, dst):
+        # Assemble each little-endian sample from the raw bytes and scale it in
+        # the same pass, so no intermediate int16 array is materialised.
+        for i in range(src.size // 2):
+            v = np.int16(src[2 * i] | (src[2 * i + 1] << 8))
+            dst[i] = np.float32(v) * _PCM16_SCALE
+
+    @njit(_signatures(types.float32, types.int16), **_KERNEL_OPTIONS)
+    def f32_to_i16_clip(src, dst):
+        # The clamp is kept for decoder output too: Opus can overshoot +/-1.0,
+        # and it costs two min/max ops in this loop rather than another pass.
+        for i in range(src.size):
+            v = min(max(src[i], np.float32(-1.0)), np.float32(1.0))
+            dst[i] = np.int16(v * np.float32(32767.0))
+
+    @njit(_signatures(types.float32, types.float32), **_KERNEL_OPTIONS)
+    def resample_linear(src, dst):
+        # Output sample i sits at source position i * n_in / n_out; integer
+        # arithmetic keeps the grid exact, and the last sample is held past the end.
+        n_in = src.size
+        n_out = dst.size
+        last = n_in - 1
+        for i in range(n_out):
+            t = i * n_in
+            j = t // n_out
+            if j >= last:
+                dst[i] = src[last]
+            else:
+                frac = np.float32(t - j * n_out) / np.float32(n_out)
+                dst[i] = src[j] + frac * (src[j + 1] - src[j])
+
+else:
+    i16_to_f32 = _i16_to_f32_numpy
+    i16bytes_to_f32 = _i16bytes_to_f32_numpy
+    f32_to_i16_clip = _f32_to_i16_clip_numpy
+    resample_linear = _resample_linear_numpy
@@ -1,19 +1,33 @@
-import asyncio
-import base64
-import json
 import os
 import logging
 from typing import Any, Dict
 
 from fastapi import FastAPI, File, Form, HTTPException, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.websockets import WebSocketState
 from pydantic import BaseModel, Field
 
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+
 from moshi_proxy import MoshiProxy
 from personaplex_runner import PersonaPlexRunner
 from transcriber import LocalTranscriber
 from tts_kokoro import LocalKokoroTts
-
-app = FastAPI()
+from wire import (
+    audio_payload,
+    b64encode,
+    batch_audio_frames,
+    decode_client_message,
+    json_dumps,
+    receive_frame,
+)
+
+# ORJSONResponse matters most for /tts, whose body is a large base64 string.
+app = FastAPI(default_response_class=ORJSONResponse if orjson is not None else JSONResponse)
 logger = logging.getLogger(__name__)
 
 
@@ -28,13 +42,18 @@ def _chunk_audio(pcm_bytes: bytes, sample_rate: int, chunk_ms: int = 200):
     bytes_per_sample = 2
     samples_per_chunk = int(sample_rate * (chunk_ms / 1000))
     bytes_per_chunk = samples_per_chunk * bytes_per_sample
-    for idx in range(0, len(pcm_bytes), bytes_per_chunk):
-        yield pcm_bytes[idx : idx + bytes_per_chunk]
+    # Zero-copy slices; the frame builder joins them straight into the payload.
+    view = memoryview(pcm_bytes)
+    for idx in range(0, len(view), bytes_per_chunk):
+        yield view[idx : idx + bytes_per_chunk]
 
 
-async def _safe_send_json(ws: WebSocket, payload: Dict[str, Any]) -> bool:
+async def _safe_send(ws: WebSocket, payload: bytes | bytearray) -> bool:
+    # Closed sockets are the common failure; checking state skips raising for them.
+    if ws.client_state is not WebSocketState.CONNECTED:
+        return False
     try:
-        await ws.send_json(payload)
+        await ws.send_bytes(payload)
         return True
     except WebSocketDisconnect:
         return False
@@ -43,6 +62,10 @@ async def _safe_send_json(ws: WebSocket, payload: Dict[str, Any]) -> bool:
         return False
 
 
+async def _safe_send_json(ws: WebSocket, payload: Dict[str, Any]) -> bool:
+    return await _safe_send(ws, json_dumps(payload))
+
+
 @app.on_event("startup")
 def _startup():
     proxy_url = os.getenv("PERSONAPLEX_PROXY_URL") or os.getenv("MOSHI_SERVER_URL")
@@ -69,7 +92,8 @@ async def transcribe_audio(
         raise HTTPException(status_code=400, detail="Audio payload is empty.")
 
     try:
-        transcript = transcriber.transcribe(payload, language=language)
+        # Decode and inference block for hundreds of ms; keep the event loop free.
+        transcript = await run_in_threadpool(transcriber.transcribe, payload, language=language)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
@@ -83,7 +107,8 @@ async def synthesize_tts(payload: TtsRequest):
         raise HTTPException(status_code=503, detail="Local TTS is not available.")
 
     try:
-        wav_bytes, sample_rate = tts.synthesize(
+        wav_bytes, sample_rate = await run_in_threadpool(
+            tts.synthesize,
             payload.text,
             voice=payload.voice,
             speed=payload.speed,
@@ -96,7 +121,7 @@ async def synthesize_tts(payload: TtsRequest):
         raise HTTPException(status_code=500, detail="Kokoro returned empty audio.")
 
     return {
-        "audio_base64": base64.b64encode(wav_bytes).decode("ascii"),
+        "audio_base64": b64encode(wav_bytes),
         "format": "wav",
         "sample_rate": sample_rate,
     }
@@ -124,11 +149,12 @@ async def websocket_endpoint(ws: WebSocket):
 
     try:
         while True:
-            raw = await ws.receive_text()
+            raw = await receive_frame(ws)
             try:
-                message = json.loads(raw)
-            except json.JSONDecodeError:
-                if not await _safe_send_json(ws, {"type": "error", "message": "Invalid JSON."}):
+                message = decode_client_message(raw)
+            except ValueError:
+                error = "Invalid JSON." if isinstance(raw, str) else "Invalid audio payload."
+                if not await _safe_send_json(ws, {"type": "error", "message": error}):
                     return
                 continue
 
@@ -153,9 +179,8 @@ async def websocket_endpoint(ws: WebSocket):
                     }
                 )
             elif msg_type == "audio":
-                data = message.get("data", "")
                 try:
-                    session_audio.extend(base64.b64decode(data))
+                    session_audio.extend(audio_payload(message))
                 except Exception:
                     if not await _safe_send_json(
                         ws, {"type": "error", "message": "Invalid audio payload."}
@@ -163,24 +188,18 @@ async def websocket_endpoint(ws: WebSocket):
                         return
             elif msg_type == "end_utterance":
                 runner: PersonaPlexRunner = app.state.runner
-                text, pcm_bytes, sample_rate = runner.generate(context, bytes(session_audio))
+                text, pcm_bytes, sample_rate = await run_in_threadpool(
+                    runner.generate, context, bytes(session_audio)
+                )
                 session_audio = bytearray()
                 if text:
                     if not await _safe_send_json(ws, {"type": "text_out", "text": text}):
                         return
-                for chunk in _chunk_audio(pcm_bytes, sample_rate):
-                    if not await _safe_send_json(
-                        ws,
-                        {
-                            "type": "audio_out",
-                            "format": "pcm16",
-                            "sampleRate": sample_rate,
-                            "channels": 1,
-                            "data": base64.b64encode(chunk).decode("ascii"),
-                        },
-                    ):
+                # No pacing sleep: awaiting the send already yields whenever the
+                # socket buffer is full, and the client schedules playback itself.
+                for frame in batch_audio_frames(_chunk_audio(pcm_bytes, sample_rate), sample_rate):
+                    if not await _safe_send(ws, frame):
                         return
-                    await asyncio.sleep(0.03)
             elif msg_type == "reset":
                 session_audio = bytearray()
             else:
@@ -1,20 +1,50 @@
 import asyncio
-import base64
 import contextlib
-import json
+import functools
+import logging
+import math
 import os
 import ssl
-from typing import Any, Dict, Optional
+from collections import deque
+from typing import Any, Callable, Dict, Optional
 
 import numpy as np
 import websockets
 from fastapi import WebSocketDisconnect
+from fastapi.websockets import WebSocketState
+
+from kernels import f32_to_i16_clip, i16bytes_to_f32, resample_linear
+from wire import (
+    AUDIO_HEADER,
+    AUDIO_OUT,
+    MAX_AUDIO_FRAME_BYTES,
+    audio_out_frame,
+    audio_payload,
+    batch_audio_frames,
+    decode_client_message,
+    json_dumps,
+    merge_audio_frames,
+    receive_frame,
+)
 
 try:
     import sphn
 except Exception as exc:  # pragma: no cover - optional dependency
     sphn = None
 
+try:
+    from scipy import signal
+except Exception:  # pragma: no cover - optional dependency
+    signal = None
+
+try:
+    # C extension for frame masking, shipped in the websockets wheels.
+    from websockets import speedups as websockets_speedups
+except Exception:  # pragma: no cover - optional dependency
+    websockets_speedups = None
+
+logger = logging.getLogger(__name__)
+
 
 def _normalize_ws_url(raw_url: str) -> str:
     if raw_url.startswith("ws://") or raw_url.startswith("wss://"):
@@ -34,19 +64,23 @@ def _ensure_chat_path(url: str) -> str:
     return f"{url}/api/chat"
 
 
-def _bytes_to_float32(pcm_bytes: bytes) -> np.ndarray:
-    if not pcm_bytes:
+def _bytes_to_float32(pcm_bytes: bytes, out: Optional[np.ndarray] = None) -> np.ndarray:
+    count = len(pcm_bytes) // 2
+    if count == 0:
         return np.zeros(0, dtype=np.float32)
-    ints = np.frombuffer(pcm_bytes, dtype=np.int16)
-    return (ints.astype(np.float32) / 32768.0).copy()
+    if out is None:
+        out = np.empty(count, dtype=np.float32)
+    i16bytes_to_f32(np.frombuffer(pcm_bytes, dtype=np.uint8), out)
+    return out
 
 
-def _float32_to_pcm16(arr: np.ndarray) -> bytes:
+def _float32_to_pcm16(arr: np.ndarray, out: Optional[np.ndarray] = None) -> bytes:
     if arr.size == 0:
         return b""
-    clipped = np.clip(arr, -1.0, 1.0)
-    ints = (clipped * 32767.0).astype(np.int16)
-    return ints.tobytes()
+    if out is None:
+        out = np.empty(arr.size, dtype=np.int16)
+    f32_to_i16_clip(arr, out)
+    return out.tobytes()
 
 
 def _resample_linear(arr: np.ndarray, input_rate: int, output_rate: int) -> np.ndarray:
@@ -56,19 +90,236 @@ def _resample_linear(arr: np.ndarray, input_rate: int, output_rate: int) -> np.n
     out_len = int(arr.size * ratio)
     if out_len <= 0:
         return np.zeros(0, dtype=np.float32)
-    x_old = np.linspace(0, 1, arr.size, endpoint=False)
-    x_new = np.linspace(0, 1, out_len, endpoint=False)
-    return np.interp(x_new, x_old, arr).astype(np.float32)
-
-
+    # Fresh output: the result is appended to the session's input buffer.
+    out = np.empty(out_len, dtype=np.float32)
+    resample_linear(arr, out)
+    return out
+
+
+# Client-declared input rates outside this range are rejected as invalid payloads.
+_MIN_INPUT_RATE = 8000
+_MAX_INPUT_RATE = 48000
+# The polyphase filter has 20 * max(up, down) + 1 taps, so ratios that do not reduce
+# (e.g. 44101/24000) would need a huge filter; those fall back to linear resampling.
+# 320 still covers 11025/22050/44100 Hz against 24 kHz.
+_MAX_POLYPHASE_FACTOR = 320
+
+
+@functools.lru_cache(maxsize=8)
+def _polyphase_taps(up: int, down: int) -> np.ndarray:
+    # Same Kaiser-windowed low-pass resample_poly designs by default, built once per ratio.
+    max_rate = max(up, down)
+    taps = signal.firwin(20 * max_rate + 1, 1.0 / max_rate, window=("kaiser", 5.0))
+    return taps.astype(np.float32)
+
+
+@functools.lru_cache(maxsize=8)
+def _resampler(input_rate: int, output_rate: int) -> Callable[[np.ndarray], np.ndarray]:
+    # Specialised once per rate pair: ratio reduction and filter design happen here,
+    # so the per-packet call is just the filter itself.
+    if input_rate == output_rate:
+        return lambda arr: arr
+    g = math.gcd(input_rate, output_rate)
+    up = output_rate // g
+    down = input_rate // g
+    if signal is None or max(up, down) > _MAX_POLYPHASE_FACTOR:
+        return functools.partial(
+            _resample_linear, input_rate=input_rate, output_rate=output_rate
+        )
+    taps = _polyphase_taps(up, down)
+
+    def resample(arr: np.ndarray) -> np.ndarray:
+        if arr.size == 0:
+            return arr
+        # "line" padding extends each packet edge instead of tapering it toward zero.
+        out = signal.resample_poly(arr, up, down, window=taps, padtype="line")
+        return out.astype(np.float32, copy=False)
+
+    return resample
+
+
+def _resample(arr: np.ndarray, input_rate: int, output_rate: int) -> np.ndarray:
+    return _resampler(input_rate, output_rate)(arr)
+
+
+# Opus frame sizes at 24 kHz: 120 samples (2.5 ms) times 1, 2, 4, 8, 16 or 24.
 _ALLOWED_FRAME_SIZES = (120, 240, 480, 960, 1920, 2880)
+_ALLOWED_FRAME_SET = frozenset(_ALLOWED_FRAME_SIZES)
+# Upper bound on client audio messages coalesced into one decode/resample pass.
+_AUDIO_DRAIN_MAX = 8
 
 
 def _next_allowed_frame_size(length: int) -> int:
-    for size in _ALLOWED_FRAME_SIZES:
-        if length <= size:
-            return size
-    return _ALLOWED_FRAME_SIZES[-1]
+    # Round up to whole 120-sample units, then to the next power-of-two multiple;
+    # anything above 16 units lands on the 24-unit (largest) frame.
+    units = max(1, -(-length // 120))
+    if units > 16:
+        return 2880
+    return 120 << (units - 1).bit_length()
+
+
+class _PcmBuffer:
+    """
+    FIFO of float32 PCM chunks with a running sample count.
+    Appends never copy the backlog; only the samples popped are copied, into
+    a frame buffer reused for every pop_frame().
+    """
+
+    def __init__(self, frame_size: int = 0) -> None:
+        self._chunks: deque[np.ndarray] = deque()
+        self._frame = np.empty(frame_size, dtype=np.float32)
+        self.size = 0
+
+    def append(self, pcm: np.ndarray) -> None:
+        if pcm.size:
+            self._chunks.append(pcm)
+            self.size += int(pcm.size)
+
+    def pop(self, count: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        count = min(count, self.size)
+        if count == 0:
+            return np.zeros(0, dtype=np.float32)
+        self.size -= count
+        head = self._chunks[0]
+        if head.size >= count:
+            # Served from one chunk: hand out a view, no copy.
+            if head.size == count:
+                self._chunks.popleft()
+            else:
+                self._chunks[0] = head[count:]
+            return head[:count]
+        if out is None or out.size < count:
+            out = np.empty(count, dtype=np.float32)
+        offset = 0
+        while offset < count:
+            head = self._chunks.popleft()
+            take = min(head.size, count - offset)
+            np.copyto(out[offset : offset + take], head[:take])
+            if take < head.size:
+                self._chunks.appendleft(head[take:])
+            offset += take
+        return out[:count]
+
+    def pop_frame(self) -> np.ndarray:
+        # The result may alias the shared frame buffer; consume it before popping again.
+        return self.pop(self._frame.size, self._frame)
+
+    def clear(self) -> None:
+        self._chunks.clear()
+        self.size = 0
+
+
+class _PcmScratch:
+    """
+    Conversion buffers owned by one session task, grown on demand and reused
+    between packets. Views are only valid until the next call.
+    """
+
+    def __init__(self, f32_size: int = 0, i16_size: int = 0) -> None:
+        self._f32 = np.empty(f32_size, dtype=np.float32)
+        self._i16 = np.empty(i16_size, dtype=np.int16)
+
+    def f32(self, size: int) -> np.ndarray:
+        if self._f32.size < size:
+            self._f32 = np.empty(size * 2, dtype=np.float32)
+        return self._f32[:size]
+
+    def i16(self, size: int) -> np.ndarray:
+        if self._i16.size < size:
+            self._i16 = np.empty(size * 2, dtype=np.int16)
+        return self._i16[:size]
+
+
+class _ClientSender:
+    """
+    Outbound queue for one browser socket, drained by its own task so the Moshi
+    reader never waits on the client. Queued audio frames are merged per send.
+    Only audio is bounded: a slow client loses audio frames, never control messages.
+    """
+
+    def __init__(self, ws_client, max_audio: int = 64, close_timeout: float = 5.0) -> None:
+        self._ws = ws_client
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._max_audio = max_audio
+        self._audio_queued = 0
+        self._audio_dropped = 0
+        self._close_timeout = close_timeout
+        self._task = asyncio.create_task(self._drain())
+        self.closed = False
+
+    def send(self, payload: bytes | bytearray) -> bool:
+        if self.closed:
+            return False
+        if self._ws.client_state is not WebSocketState.CONNECTED:
+            self.closed = True
+            return False
+        if payload[0] == AUDIO_OUT:
+            if self._audio_queued >= self._max_audio:
+                # Logged once per backlog, not once per dropped frame.
+                if not self._audio_dropped:
+                    logger.warning("Client send queue is full; dropping audio frames.")
+                self._audio_dropped += 1
+                return True
+            if self._audio_dropped:
+                logger.warning(
+                    "Client send queue drained after %d dropped audio frames.",
+                    self._audio_dropped,
+                )
+                self._audio_dropped = 0
+            self._audio_queued += 1
+        self._queue.put_nowait(payload)
+        return True
+
+    def send_json(self, payload: Dict[str, Any]) -> bool:
+        return self.send(json_dumps(payload))
+
+    def _dequeued(self, payload: bytes | bytearray | None) -> bytes | bytearray | None:
+        if payload is not None and payload[0] == AUDIO_OUT:
+            self._audio_queued -= 1
+        return payload
+
+    async def _drain(self) -> None:
+        pending: list = []
+        try:
+            while True:
+                payload = pending.pop() if pending else self._dequeued(await self._queue.get())
+                if payload is None:
+                    return
+                if payload[0] != AUDIO_OUT:
+                    await self._ws.send_bytes(payload)
+                    continue
+                frames = [payload]
+                size = len(payload)
+                header = payload[: AUDIO_HEADER.size]
+                while not self._queue.empty():
+                    queued = self._dequeued(self._queue.get_nowait())
+                    if (
+                        queued is not None
+                        and queued[: AUDIO_HEADER.size] == header
+                        and size + len(queued) - AUDIO_HEADER.size <= MAX_AUDIO_FRAME_BYTES
+                    ):
+                        frames.append(queued)
+                        size += len(queued) - AUDIO_HEADER.size
+                    else:
+                        pending.append(queued)
+                        break
+                await self._ws.send_bytes(
+                    merge_audio_frames(frames) if len(frames) > 1 else payload
+                )
+        except Exception:
+            # Includes WebSocketDisconnect and transport-level disconnects.
+            self.closed = True
+
+    async def close(self) -> None:
+        # Let already queued messages (e.g. a final error) reach the client.
+        if not self._task.done():
+            self._queue.put_nowait(None)
+            done, _ = await asyncio.wait({self._task}, timeout=self._close_timeout)
+            if not done:
+                self._task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await self._task
+        self.closed = True
 
 
 class MoshiProxy:
@@ -78,6 +329,11 @@ class MoshiProxy:
                 "sphn is required for Moshi proxy mode. Install it with "
                 "`pip install sphn` in voice_server."
             )
+        if websockets_speedups is None:
+            logger.warning(
+                "websockets C speedups are unavailable; upstream frame masking "
+                "runs in pure Python. Install websockets from a binary wheel."
+            )
         normalized = _ensure_chat_path(_normalize_ws_url(server_url))
         self.server_url = normalized
         self.sample_rate = int(os.getenv("MOSHI_SAMPLE_RATE", "24000"))
@@ -86,7 +342,14 @@ class MoshiProxy:
         self.min_output_flush = int(os.getenv("MOSHI_MIN_OUTPUT_FLUSH", "480"))
         self.input_chunk = int(os.getenv("MOSHI_INPUT_CHUNK", "1920"))
         self.insecure = os.getenv("MOSHI_INSECURE", "0") == "1"
-        if self.input_chunk not in _ALLOWED_FRAME_SIZES:
+        self.handshake_timeout = float(os.getenv("MOSHI_HANDSHAKE_TIMEOUT", "120"))
+        self.reconnect_delay = float(os.getenv("MOSHI_RECONNECT_DELAY", "0.5"))
+        # Warm the resampler cache so the client's usual rate pays for its filter
+        # design here rather than on the first audio packet.
+        _resampler(self.input_rate, self.sample_rate)
+        # Loading the CA bundle is the costly part; one context serves every session.
+        self.ssl_context = self._ssl_context()
+        if self.input_chunk not in _ALLOWED_FRAME_SET:
             self.input_chunk = 1920
         if self.min_output_flush <= 0:
             self.min_output_flush = 480
@@ -101,39 +364,21 @@ class MoshiProxy:
             return ssl.create_default_context()
         return None
 
-    @staticmethod
-    async def _safe_send_json(ws_client, payload: Dict[str, Any]) -> bool:
-        try:
-            await ws_client.send_json(payload)
-            return True
-        except WebSocketDisconnect:
-            return False
-        except Exception:
-            # Includes transport-level disconnects surfaced by Uvicorn/Starlette.
-            return False
-
-    async def _forward_from_moshi(self, ws_moshi, ws_client, ready_event: asyncio.Event) -> None:
+    async def _forward_from_moshi(
+        self, ws_moshi, sender: _ClientSender, ready_event: asyncio.Event
+    ) -> None:
         reader = sphn.OpusStreamReader(self.sample_rate)
-        buffered_audio = np.zeros(0, dtype=np.float32)
+        buffered_audio = _PcmBuffer(self.output_chunk)
+        # Sized for a packet's full chunks plus a tail; grows if Moshi bursts.
+        scratch = _PcmScratch(i16_size=2 * self.output_chunk)
 
-        async def flush_audio(force: bool = False) -> bool:
-            nonlocal buffered_audio
+        def flush_audio() -> bool:
             if buffered_audio.size == 0:
                 return True
-            if not force and buffered_audio.size < self.min_output_flush:
-                return True
-            b64 = base64.b64encode(_float32_to_pcm16(buffered_audio)).decode("ascii")
-            buffered_audio = np.zeros(0, dtype=np.float32)
-            return await self._safe_send_json(
-                ws_client,
-                {
-                    "type": "audio_out",
-                    "format": "pcm16",
-                    "sampleRate": self.sample_rate,
-                    "channels": 1,
-                    "data": b64,
-                },
-            )
+            tail = buffered_audio.pop(buffered_audio.size)
+            pcm16 = _float32_to_pcm16(tail, scratch.i16(tail.size))
+            frame = audio_out_frame([pcm16], self.sample_rate)
+            return sender.send(frame)
 
         async for message in ws_moshi:
             if not isinstance(message, (bytes, bytearray)):
@@ -142,57 +387,60 @@ class MoshiProxy:
                 # End of chunk from server.
                 continue
             kind = message[0]
-            payload = message[1:]
             if kind == 0:
                 # NVIDIA/Kyutai Moshi handshake byte.
                 ready_event.set()
                 continue
             if kind == 1:
-                pcm = self._reader_append(reader, payload)
+                # sphn's append_bytes only takes bytes, so the Opus payload is copied.
+                pcm = self._reader_append(reader, message[1:])
                 if pcm is None or pcm.size == 0:
                     continue
-                buffered_audio = (
-                    np.concatenate([buffered_audio, pcm]) if buffered_audio.size else pcm
-                )
-                while buffered_audio.size >= self.output_chunk:
-                    chunk = buffered_audio[: self.output_chunk]
-                    buffered_audio = buffered_audio[self.output_chunk :]
-                    b64 = base64.b64encode(_float32_to_pcm16(chunk)).decode("ascii")
-                    if not await self._safe_send_json(
-                        ws_client,
-                        {
-                            "type": "audio_out",
-                            "format": "pcm16",
-                            "sampleRate": self.sample_rate,
-                            "channels": 1,
-                            "data": b64,
-                        },
-                    ):
+                buffered_audio.append(pcm)
+                # Ship a meaningful tail in the same frame as this packet's full
+                # chunks; tiny tails wait so the client is not flooded.
+                total = buffered_audio.size
+                if total % self.output_chunk < self.min_output_flush:
+                    total -= total % self.output_chunk
+                if total == 0:
+                    continue
+                # Convert every chunk into one scratch array and frame byte views of
+                # it; the frames copy the PCM, so no per-chunk bytes are allocated.
+                pcm16 = scratch.i16(total)
+                pcm16_bytes = pcm16.view(np.uint8).data
+                chunks = []
+                for start in range(0, total, self.output_chunk):
+                    stop = min(start + self.output_chunk, total)
+                    if stop - start == self.output_chunk:
+                        chunk = buffered_audio.pop_frame()
+                    else:
+                        chunk = buffered_audio.pop(stop - start)
+                    f32_to_i16_clip(chunk, pcm16[start:stop])
+                    chunks.append(pcm16_bytes[2 * start : 2 * stop])
+                for frame in batch_audio_frames(chunks, self.sample_rate):
+                    if not sender.send(frame):
                         return
-                # Flush only when we have a meaningful tail size to avoid
-                # flooding the client with tiny packets.
-                if not await flush_audio(force=False):
-                    return
             elif kind == 2:
                 # Keep audio/text aligned around token boundaries.
-                if not await flush_audio(force=True):
+                if not flush_audio():
                     return
-                text = payload.decode("utf-8", errors="ignore")
+                # Decode straight from a view; no intermediate payload copy.
+                text = str(memoryview(message)[1:], "utf-8", "ignore")
                 if text:
-                    if not await self._safe_send_json(
-                        ws_client, {"type": "text_out", "text": text}
-                    ):
+                    if not sender.send_json({"type": "text_out", "text": text}):
                         return
-        await flush_audio(force=True)
+        flush_audio()
 
     async def handle_session(self, ws_client) -> None:
-        ssl_context = self._ssl_context()
-        handshake_timeout = float(os.getenv("MOSHI_HANDSHAKE_TIMEOUT", "120"))
-        reconnect_delay = float(os.getenv("MOSHI_RECONNECT_DELAY", "0.5"))
-        buffered_input = np.zeros(0, dtype=np.float32)
+        buffered_input = _PcmBuffer(self.input_chunk)
+        scratch = _PcmScratch(f32_size=self.input_chunk)
+        sender = _ClientSender(ws_client)
         writer = sphn.OpusStreamWriter(self.sample_rate)
+        upstream_frame = bytearray(4096)
         ws_moshi = None
         forward_task: asyncio.Task | None = None
+        recv_task: asyncio.Task | None = None
+        pending_raw: str | bytes | None = None
         ready_event: asyncio.Event | None = None
 
         async def close_upstream() -> None:
@@ -210,6 +458,50 @@ class MoshiProxy:
                 ws_moshi = None
             ready_event = None
 
+        async def send_upstream_audio(parts: list[bytes]) -> None:
+            # The Opus output is one continuous Ogg stream, so pages encoded from
+            # several frames can share a single websocket message.
+            nonlocal upstream_frame
+            size = 1 + sum(len(part) for part in parts)
+            if size > len(upstream_frame):
+                upstream_frame = bytearray(size * 2)
+            upstream_frame[0] = 1
+            offset = 1
+            for part in parts:
+                upstream_frame[offset : offset + len(part)] = part
+                offset += len(part)
+            # websockets frames (and masks) the payload before send() returns,
+            # so the same buffer is safe to reuse for the next packet.
+            await ws_moshi.send(memoryview(upstream_frame)[:size])
+
+        async def drain_audio(pcm_bytes: bytes | memoryview, input_rate: int) -> bytes:
+            # Coalesce audio messages already waiting on the socket so a burst pays
+            # for one decode/resample/append instead of one per message.
+            nonlocal recv_task, pending_raw
+            parts = [pcm_bytes]
+            for _ in range(_AUDIO_DRAIN_MAX - 1):
+                if recv_task is None:
+                    recv_task = asyncio.create_task(receive_frame(ws_client))
+                    await asyncio.sleep(0)
+                # A disconnect stays in recv_task for the main loop to observe.
+                if not recv_task.done() or recv_task.exception() is not None:
+                    break
+                raw = recv_task.result()
+                recv_task = None
+                try:
+                    message = decode_client_message(raw)
+                    if (
+                        message.get("type") != "audio"
+                        or int(message.get("sampleRate") or self.input_rate) != input_rate
+                    ):
+                        raise ValueError
+                    parts.append(audio_payload(message))
+                except Exception:
+                    # Anything else is handled by the main loop, in order.
+                    pending_raw = raw
+                    break
+            return parts[0] if len(parts) == 1 else b"".join(parts)
+
         async def ensure_upstream() -> bool:
             nonlocal ws_moshi, forward_task, ready_event, writer
             if ws_moshi is not None and forward_task is not None:
@@ -217,42 +509,42 @@ class MoshiProxy:
             try:
                 ws_moshi = await websockets.connect(
                     self.server_url,
-                    ssl=ssl_context,
+                    ssl=self.ssl_context,
                     ping_interval=None,
                     ping_timeout=None,
                     max_size=None,
+                    # Opus packets are incompressible; skip permessage-deflate.
+                    compression=None,
                 )
             except Exception:
-                await self._safe_send_json(
-                    ws_client,
+                sender.send_json(
                     {
                         "type": "error",
                         "message": "Unable to connect to PersonaPlex upstream.",
-                    },
+                    }
                 )
-                await asyncio.sleep(reconnect_delay)
+                await asyncio.sleep(self.reconnect_delay)
                 return False
 
             writer = sphn.OpusStreamWriter(self.sample_rate)
             ready_event = asyncio.Event()
             forward_task = asyncio.create_task(
-                self._forward_from_moshi(ws_moshi, ws_client, ready_event)
+                self._forward_from_moshi(ws_moshi, sender, ready_event)
             )
 
             try:
-                await asyncio.wait_for(ready_event.wait(), timeout=handshake_timeout)
+                await asyncio.wait_for(ready_event.wait(), timeout=self.handshake_timeout)
             except asyncio.TimeoutError:
-                await self._safe_send_json(
-                    ws_client,
+                sender.send_json(
                     {
                         "type": "error",
                         "message": "PersonaPlex handshake timed out. Check Moshi server logs.",
-                    },
+                    }
                 )
                 await close_upstream()
                 return False
 
-            if not await self._safe_send_json(ws_client, {"type": "ready"}):
+            if not sender.send_json({"type": "ready"}):
                 return False
             return True
 
@@ -262,28 +554,38 @@ class MoshiProxy:
                     exc = forward_task.exception()
                     await close_upstream()
                     if exc is not None:
-                        await self._safe_send_json(
-                            ws_client,
+                        sender.send_json(
                             {
                                 "type": "error",
                                 "message": f"PersonaPlex upstream closed: {exc}",
-                            },
+                            }
                         )
                     continue
 
-                try:
-                    raw = await asyncio.wait_for(ws_client.receive_text(), timeout=1.0)
-                except asyncio.TimeoutError:
-                    continue
-                except WebSocketDisconnect:
-                    return
+                if pending_raw is not None:
+                    raw, pending_raw = pending_raw, None
+                else:
+                    # Sleep until the client sends something or the upstream reader
+                    # exits; no periodic wakeups for idle sessions.
+                    if recv_task is None:
+                        recv_task = asyncio.create_task(receive_frame(ws_client))
+                    waiters = (
+                        {recv_task} if forward_task is None else {recv_task, forward_task}
+                    )
+                    await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                    if not recv_task.done():
+                        continue
+                    received, recv_task = recv_task, None
+                    try:
+                        raw = received.result()
+                    except WebSocketDisconnect:
+                        return
 
                 try:
-                    message = json.loads(raw)
+                    message = decode_client_message(raw)
                 except Exception:
-                    if not await self._safe_send_json(
-                        ws_client, {"type": "error", "message": "Invalid JSON."}
-                    ):
+                    error = "Invalid JSON." if isinstance(raw, str) else "Invalid audio payload."
+                    if not sender.send_json({"type": "error", "message": error}):
                         return
                     continue
 
@@ -294,71 +596,78 @@ class MoshiProxy:
 
                 if msg_type == "reset":
                     # Keep a continuous Opus stream across turns; only clear buffered PCM.
-                    buffered_input = np.zeros(0, dtype=np.float32)
+                    buffered_input.clear()
                     continue
 
                 if not await ensure_upstream():
                     continue
 
                 if msg_type == "audio":
-                    payload = message.get("data", "")
-                    input_rate = int(message.get("sampleRate") or self.input_rate)
                     try:
-                        pcm_bytes = base64.b64decode(payload)
+                        input_rate = int(message.get("sampleRate") or self.input_rate)
+                        if not _MIN_INPUT_RATE <= input_rate <= _MAX_INPUT_RATE:
+                            raise ValueError(f"Unsupported sample rate: {input_rate}")
+                        pcm_bytes = audio_payload(message)
                     except Exception:
-                        if not await self._safe_send_json(
-                            ws_client,
-                            {"type": "error", "message": "Invalid audio payload."},
+                        if not sender.send_json(
+                            {"type": "error", "message": "Invalid audio payload."}
                         ):
                             return
                         continue
-                    pcm = _bytes_to_float32(pcm_bytes)
-                    pcm = _resample_linear(pcm, input_rate, self.sample_rate)
+                    pcm_bytes = await drain_audio(pcm_bytes, input_rate)
+                    # Decoded samples land in scratch only when resampling copies them
+                    # out again; otherwise they are buffered and need their own array.
+                    decode_out = (
+                        scratch.f32(len(pcm_bytes) // 2)
+                        if input_rate != self.sample_rate
+                        else None
+                    )
+                    pcm = _bytes_to_float32(pcm_bytes, decode_out)
+                    pcm = _resample(pcm, input_rate, self.sample_rate)
                     if pcm.size == 0:
                         continue
-                    buffered_input = (
-                        np.concatenate([buffered_input, pcm])
-                        if buffered_input.size
-                        else pcm
-                    )
-                    stream_failed = False
+                    buffered_input.append(pcm)
+                    # sphn encodes one valid frame size per call; the output goes
+                    # upstream together once the backlog is encoded.
+                    encoded_parts = []
                     while buffered_input.size >= self.input_chunk:
-                        chunk = buffered_input[: self.input_chunk]
-                        encoded = self._writer_append(writer, chunk)
+                        encoded = self._writer_append(writer, buffered_input.pop_frame())
                         if encoded:
-                            try:
-                                await ws_moshi.send(b"\x01" + encoded)
-                            except websockets.ConnectionClosed:
-                                stream_failed = True
-                                break
-                        buffered_input = buffered_input[self.input_chunk :]
-                    if stream_failed:
-                        await close_upstream()
-                        continue
+                            encoded_parts.append(encoded)
+                    if encoded_parts:
+                        try:
+                            await send_upstream_audio(encoded_parts)
+                        except websockets.ConnectionClosed:
+                            await close_upstream()
+                            continue
                 elif msg_type == "end_utterance":
                     # Flush remaining buffered PCM in a valid frame size.
                     if buffered_input.size:
-                        frame_size = _next_allowed_frame_size(int(buffered_input.size))
-                        if buffered_input.size < frame_size:
-                            pad = np.zeros(frame_size - buffered_input.size, dtype=np.float32)
-                            chunk = np.concatenate([buffered_input, pad])
-                        else:
-                            chunk = buffered_input[:frame_size]
-                        buffered_input = np.zeros(0, dtype=np.float32)
+                        frame_size = _next_allowed_frame_size(buffered_input.size)
+                        chunk = buffered_input.pop(frame_size)
+                        buffered_input.clear()
+                        if chunk.size < frame_size:
+                            pad = np.zeros(frame_size - chunk.size, dtype=np.float32)
+                            chunk = np.concatenate([chunk, pad])
                         encoded = self._writer_append(writer, chunk)
                         if encoded:
                             try:
-                                await ws_moshi.send(b"\x01" + encoded)
+                                await send_upstream_audio([encoded])
                             except websockets.ConnectionClosed:
                                 await close_upstream()
                                 continue
                 else:
-                    if not await self._safe_send_json(
-                        ws_client, {"type": "error", "message": "Unknown message type."}
+                    if not sender.send_json(
+                        {"type": "error", "message": "Unknown message type."}
                     ):
                         return
         finally:
+            if recv_task is not None:
+                recv_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError, WebSocketDisconnect):
+                    await recv_task
             await close_upstream()
+            await sender.close()
 
     @staticmethod
     def _reader_append(reader, payload: bytes):
@@ -1,9 +1,11 @@
-import math
+import functools
 import os
 import time
 from dataclasses import dataclass
 from typing import Dict, Optional, Tuple
 
+import numpy as np
+
 
 def _ensure_cuda_available() -> None:
     try:
@@ -20,16 +22,14 @@ def _ensure_cuda_available() -> None:
         )
 
 
+@functools.lru_cache(maxsize=4)
 def _generate_beep(duration_sec: float = 0.6, sample_rate: int = 16000) -> bytes:
     total_samples = int(duration_sec * sample_rate)
     amplitude = 0.15
     freq = 880.0
-    pcm = bytearray()
-    for n in range(total_samples):
-        value = amplitude * math.sin(2 * math.pi * freq * (n / sample_rate))
-        int_val = int(max(-1.0, min(1.0, value)) * 32767)
-        pcm.extend(int_val.to_bytes(2, byteorder="little", signed=True))
-    return bytes(pcm)
+    t = np.arange(total_samples, dtype=np.float64) / sample_rate
+    wave = np.clip(amplitude * np.sin(2 * np.pi * freq * t), -1.0, 1.0)
+    return (wave * 32767).astype("<i2").tobytes()
 
 
 @dataclass
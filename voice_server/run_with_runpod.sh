@@ -65,4 +65,5 @@ VOICE_SERVER_PORT="${VOICE_SERVER_PORT:-8008}"
 
 echo "Using PERSONAPLEX_PROXY_URL=$PERSONAPLEX_PROXY_URL"
 echo "Starting voice server on ${VOICE_SERVER_HOST}:${VOICE_SERVER_PORT}"
-exec python -m uvicorn main:app --host "$VOICE_SERVER_HOST" --port "$VOICE_SERVER_PORT"
+exec python -m uvicorn main:app --host "$VOICE_SERVER_HOST" --port "$VOICE_SERVER_PORT" --loop uvloop \
+  --ws-per-message-deflate false
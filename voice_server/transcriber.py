@@ -1,18 +1,36 @@
+import io
+import logging
 import os
+import shutil
 import subprocess
+import threading
 from typing import Optional
 
 import numpy as np
 
+from kernels import i16_to_f32
+
+try:
+    import av
+except Exception:  # pragma: no cover - optional dependency
+    av = None
+
+logger = logging.getLogger(__name__)
+
 
 class LocalTranscriber:
     """
     Lightweight local STT wrapper for Firefox/non-WebSpeech browsers.
-    Uses Whisper via Transformers and ffmpeg decode to mono 16k PCM.
+    Uses Whisper via Transformers and ffmpeg decode to mono 16k PCM
+    (in-process through PyAV when installed, otherwise the ffmpeg CLI).
     """
 
     def __init__(self) -> None:
         self.model_id = os.getenv("LOCAL_WHISPER_MODEL", "openai/whisper-tiny.en")
+        # Opt-in: compilation adds warm-up time and recompiles for new input shapes.
+        self.compile_model = os.getenv("LOCAL_WHISPER_COMPILE", "0") == "1"
+        # Requests run in the threadpool; the model is loaded and used by one at a time.
+        self._lock = threading.Lock()
         self._pipeline = None
         self._load_error: Optional[str] = None
 
@@ -26,13 +44,21 @@ class LocalTranscriber:
             import torch
             from transformers import pipeline
 
-            device = "cuda:0" if torch.cuda.is_available() else "cpu"
+            use_cuda = torch.cuda.is_available()
+            device = "cuda:0" if use_cuda else "cpu"
             self._pipeline = pipeline(
                 task="automatic-speech-recognition",
                 model=self.model_id,
                 device=device,
                 chunk_length_s=25,
+                # Half precision only on GPU; CPU fp16 kernels are slow or missing.
+                torch_dtype=torch.float16 if use_cuda else torch.float32,
+                model_kwargs={"attn_implementation": "sdpa"},
             )
+            if use_cuda and self.compile_model:
+                self._pipeline.model = torch.compile(
+                    self._pipeline.model, mode="reduce-overhead", fullgraph=False
+                )
             return self._pipeline
         except Exception as exc:
             self._load_error = (
@@ -42,8 +68,33 @@ class LocalTranscriber:
             )
             raise RuntimeError(self._load_error) from exc
 
+    @staticmethod
+    def _decode_with_av(audio_bytes: bytes) -> bytes:
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=16000)
+        parts = []
+        with av.open(io.BytesIO(audio_bytes)) as container:
+            stream = container.streams.audio[0]
+            for frame in container.decode(stream):
+                parts.extend(out.to_ndarray() for out in resampler.resample(frame))
+        # Drain samples still buffered in the resampler.
+        parts.extend(out.to_ndarray() for out in resampler.resample(None))
+        return b"".join(part.tobytes() for part in parts)
+
     @staticmethod
     def _decode_to_pcm16_mono_16k(audio_bytes: bytes) -> bytes:
+        if av is not None:
+            # Decoding in-process skips an ffmpeg fork/exec per request; on failure
+            # the CLI below runs and produces the user-facing error details.
+            try:
+                return LocalTranscriber._decode_with_av(audio_bytes)
+            except Exception as exc:
+                logger.warning("PyAV decode failed: %s", exc)
+                if shutil.which("ffmpeg") is None:
+                    # No CLI fallback on this host; report the real decode error.
+                    raise RuntimeError(
+                        "Audio decode failed. Provide a supported audio format."
+                        f" Details: {str(exc)[:180]}"
+                    ) from exc
         cmd = [
             "ffmpeg",
             "-nostdin",
@@ -81,20 +132,24 @@ class LocalTranscriber:
         if not audio_bytes:
             return ""
 
-        pipeline = self._load_pipeline()
         pcm = self._decode_to_pcm16_mono_16k(audio_bytes)
         if not pcm:
             return ""
 
-        samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
-        if samples.size == 0:
+        ints = np.frombuffer(pcm, dtype=np.int16)
+        if ints.size == 0:
             return ""
+        # One pass straight into the float32 array handed to Whisper.
+        samples = np.empty(ints.size, dtype=np.float32)
+        i16_to_f32(ints, samples)
 
         options = {}
         if language and not str(self.model_id).endswith(".en"):
             options = {"generate_kwargs": {"language": str(language)[:8]}}
 
-        result = pipeline({"raw": samples, "sampling_rate": 16000}, **options)
+        with self._lock:
+            pipeline = self._load_pipeline()
+            result = pipeline({"raw": samples, "sampling_rate": 16000}, **options)
         if isinstance(result, dict):
             text = result.get("text", "")
             return str(text).strip()
@@ -1,25 +1,63 @@
-import io
+import functools
 import os
-import wave
-from typing import Dict, Optional
+import re
+import struct
+import threading
+from typing import Optional
 
 import numpy as np
 
-
-def _float32_to_pcm16(arr: np.ndarray) -> np.ndarray:
-    clipped = np.clip(arr, -1.0, 1.0)
-    return (clipped * 32767.0).astype(np.int16)
-
-
-def _pcm16_wav_bytes(samples: np.ndarray, sample_rate: int) -> bytes:
-    pcm16 = _float32_to_pcm16(samples)
-    with io.BytesIO() as buffer:
-        with wave.open(buffer, "wb") as wav:
-            wav.setnchannels(1)
-            wav.setsampwidth(2)
-            wav.setframerate(sample_rate)
-            wav.writeframes(pcm16.tobytes())
-        return buffer.getvalue()
+from kernels import f32_to_i16_clip
+
+
+def _float32_to_pcm16(arr: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    # Same fused clip/scale/cast kernel as the Moshi proxy (NumPy fallback without numba).
+    if out is None:
+        out = np.empty(arr.size, dtype=np.int16)
+    f32_to_i16_clip(np.ascontiguousarray(arr, dtype=np.float32), out)
+    return out
+
+
+_SAMPLE_RATE = 24000
+# Canonical 44-byte RIFF header for mono 16-bit PCM (what `wave` writes).
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+_WAV_HEADER_SIZE = _WAV_HEADER.size
+# Kokoro passes split_pattern to re.split, which takes a compiled pattern as-is.
+_SPLIT_PATTERN = re.compile(r"\n+")
+
+
+def _write_wav_header(buf: bytearray, nframes: int, sample_rate: int) -> None:
+    # Packs straight into the space reserved at the front of the output buffer.
+    data_size = nframes * 2
+    _WAV_HEADER.pack_into(
+        buf,
+        0,
+        b"RIFF",
+        36 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,
+        1,
+        sample_rate,
+        sample_rate * 2,
+        2,
+        16,
+        b"data",
+        data_size,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _torch_module():
+    # Looked up once, on the first chunk, and remembered even when missing; a
+    # module-level import would load torch at server start for nothing.
+    try:
+        import torch  # type: ignore
+    except Exception:
+        # Torch may not be importable in lightweight environments.
+        return None
+    return torch
 
 
 def _extract_audio_chunk(item) -> np.ndarray:
@@ -35,17 +73,26 @@ def _extract_audio_chunk(item) -> np.ndarray:
     if audio is None:
         return np.zeros(0, dtype=np.float32)
 
-    # Kokoro may return torch tensors depending on runtime.
-    try:
-        import torch  # type: ignore
+    # Fast path: already the 1-D float32 array the converter takes, so skip the
+    # torch probe and the asarray/reshape round trip.
+    if isinstance(audio, np.ndarray) and audio.dtype == np.float32 and audio.ndim == 1:
+        return audio
 
-        if isinstance(audio, torch.Tensor):
-            audio = audio.detach().float().cpu().numpy()
-    except Exception:
-        # Torch may not be importable in lightweight environments.
-        pass
-
-    arr = np.asarray(audio, dtype=np.float32).reshape(-1)
+    # Kokoro may return torch tensors depending on runtime.
+    torch = _torch_module()
+    if torch is not None and isinstance(audio, torch.Tensor):
+        if audio.dtype != torch.float32:
+            audio = audio.to(torch.float32)
+        # Detaches and copies to host only when needed; a CPU float32 tensor comes
+        # back as a view, which the generic path below then passes through uncopied.
+        audio = audio.numpy(force=True)
+
+    arr = audio if isinstance(audio, np.ndarray) else np.asarray(audio)
+    if arr.dtype != np.float32:
+        arr = arr.astype(np.float32, copy=False)
+    # A view for C-contiguous input; strided input is copied once, into the
+    # contiguous layout the conversion kernel requires.
+    arr = arr.ravel()
     if arr.size == 0:
         return np.zeros(0, dtype=np.float32)
     return arr
@@ -62,12 +109,16 @@ class LocalKokoroTts:
         self.default_voice = os.getenv("KOKORO_VOICE", "af_heart")
         self.default_speed = float(os.getenv("KOKORO_SPEED", "0.95"))
         self.default_lang_code = os.getenv("KOKORO_LANG_CODE", "a")
-        self._pipelines: Dict[str, object] = {}
+        # Requests run in the threadpool; Kokoro is loaded and used by one at a time.
+        self._lock = threading.Lock()
+        # One pipeline per lang_code, kept for the process lifetime (failures raise and
+        # are not cached). Unbounded: evicting would reload a model.
+        self._load_pipeline = functools.lru_cache(maxsize=None)(self._load_pipeline_uncached)
+        # WAV output buffer reused across calls (under _lock); keeps its high-water size.
+        self._wav_buf = bytearray()
         self._load_error: Optional[str] = None
 
-    def _load_pipeline(self, lang_code: str):
-        if lang_code in self._pipelines:
-            return self._pipelines[lang_code]
+    def _load_pipeline_uncached(self, lang_code: str):
         if self._load_error is not None:
             raise RuntimeError(self._load_error)
 
@@ -80,9 +131,7 @@ class LocalKokoroTts:
             raise RuntimeError(self._load_error) from exc
 
         try:
-            pipeline = KPipeline(lang_code=lang_code)
-            self._pipelines[lang_code] = pipeline
-            return pipeline
+            return KPipeline(lang_code=lang_code)
         except Exception as exc:
             self._load_error = (
                 f"Failed to initialize Kokoro pipeline (lang_code={lang_code}). "
@@ -90,20 +139,21 @@ class LocalKokoroTts:
             )
             raise RuntimeError(self._load_error) from exc
 
-    def synthesize(
+    def _render(
         self,
         text: str,
-        *,
-        voice: Optional[str] = None,
-        speed: Optional[float] = None,
-        lang_code: Optional[str] = None,
-    ) -> tuple[bytes, int]:
+        voice: Optional[str],
+        speed: Optional[float],
+        lang_code: Optional[str],
+    ) -> int:
+        # Fills self._wav_buf with PCM16 after room for the WAV header and returns the
+        # end offset; callers hold self._lock until they have copied the result out.
         if not self.enabled:
             raise RuntimeError("Local TTS provider is disabled.")
 
         normalized_text = text.strip()
         if not normalized_text:
-            return b"", 24000
+            return _WAV_HEADER_SIZE
 
         use_voice = (voice or self.default_voice).strip() or self.default_voice
         use_speed = speed if speed is not None else self.default_speed
@@ -115,18 +165,53 @@ class LocalKokoroTts:
             normalized_text,
             voice=use_voice,
             speed=use_speed,
-            split_pattern=r"\n+",
+            split_pattern=_SPLIT_PATTERN,
         )
-
-        chunks = []
+        # Each chunk is converted straight into the buffer, so float32 chunks are
+        # dropped immediately and no PCM is copied. Keep it per chunk: chunks are
+        # whole sentences (thousands of samples), so one pass over a concatenated
+        # array would vectorize no better and cost a float32 copy of the utterance.
+        buf = self._wav_buf
+        size = _WAV_HEADER_SIZE
         for item in generator:
             arr = _extract_audio_chunk(item)
-            if arr.size:
-                chunks.append(arr)
-
-        if not chunks:
-            return b"", 24000
+            if not arr.size:
+                continue
+            end = size + arr.size * 2
+            if end > len(buf):
+                buf.extend(bytes(max(end, 2 * len(buf)) - len(buf)))
+            pcm16 = np.frombuffer(buf, dtype=np.int16, count=arr.size, offset=size)
+            _float32_to_pcm16(arr, pcm16)
+            # Release the buffer export so the bytearray can grow again.
+            del pcm16
+            size = end
+        return size
+
+    def synthesize_pcm(
+        self,
+        text: str,
+        *,
+        voice: Optional[str] = None,
+        speed: Optional[float] = None,
+        lang_code: Optional[str] = None,
+    ) -> tuple[bytes, int]:
+        """Raw mono 16-bit little-endian PCM and its sample rate, without a WAV header."""
+        with self._lock:
+            size = self._render(text, voice, speed, lang_code)
+            return bytes(memoryview(self._wav_buf)[_WAV_HEADER_SIZE:size]), _SAMPLE_RATE
 
-        samples = np.concatenate(chunks).astype(np.float32)
-        wav = _pcm16_wav_bytes(samples, 24000)
-        return wav, 24000
+    def synthesize(
+        self,
+        text: str,
+        *,
+        voice: Optional[str] = None,
+        speed: Optional[float] = None,
+        lang_code: Optional[str] = None,
+    ) -> tuple[bytes, int]:
+        with self._lock:
+            size = self._render(text, voice, speed, lang_code)
+            if size == _WAV_HEADER_SIZE:
+                return b"", _SAMPLE_RATE
+            buf = self._wav_buf
+            _write_wav_header(buf, (size - _WAV_HEADER_SIZE) // 2, _SAMPLE_RATE)
+            return bytes(memoryview(buf)[:size]), _SAMPLE_RATE
@@ -0,0 +1,132 @@
+import base64
+import binascii
+import json
+import struct
+from typing import Any, Iterable, Iterator, Sequence
+
+from fastapi import WebSocketDisconnect
+
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import pybase64
+except Exception:  # pragma: no cover - optional dependency
+    pybase64 = None
+
+# Binary websocket envelope for PCM16 audio, in both directions:
+# type byte + little-endian uint32 sampleRate + uint16 channels, then raw PCM.
+AUDIO_OUT = 0x01
+AUDIO_IN = 0x02
+AUDIO_HEADER = struct.Struct("<BIH")
+
+# Chunks merged into one websocket frame, bounded so a single frame stays small.
+AUDIO_FRAME_BATCH = 3
+MAX_AUDIO_FRAME_BYTES = 64 * 1024
+
+
+def audio_out_frame(
+    pcm_chunks: Sequence[bytes | memoryview], sample_rate: int, channels: int = 1
+) -> bytearray:
+    # One exact-size allocation: header packed in place, PCM copied in after it.
+    header_size = AUDIO_HEADER.size
+    frame = bytearray(header_size + sum(len(chunk) for chunk in pcm_chunks))
+    AUDIO_HEADER.pack_into(frame, 0, AUDIO_OUT, sample_rate, channels)
+    offset = header_size
+    for chunk in pcm_chunks:
+        frame[offset : offset + len(chunk)] = chunk
+        offset += len(chunk)
+    return frame
+
+
+def batch_audio_frames(
+    chunks: Iterable[bytes | memoryview],
+    sample_rate: int,
+    channels: int = 1,
+    max_chunks: int = AUDIO_FRAME_BATCH,
+) -> Iterator[bytearray]:
+    pending: list[bytes | memoryview] = []
+    pending_bytes = 0
+    for chunk in chunks:
+        if pending and (
+            len(pending) >= max_chunks or pending_bytes + len(chunk) > MAX_AUDIO_FRAME_BYTES
+        ):
+            yield audio_out_frame(pending, sample_rate, channels)
+            pending = []
+            pending_bytes = 0
+        pending.append(chunk)
+        pending_bytes += len(chunk)
+    if pending:
+        yield audio_out_frame(pending, sample_rate, channels)
+
+
+def merge_audio_frames(frames: Sequence[bytes | bytearray]) -> bytearray:
+    # Frames must share one header (same sampleRate/channels); keep the first.
+    _, sample_rate, channels = AUDIO_HEADER.unpack_from(frames[0])
+    header_size = AUDIO_HEADER.size
+    return audio_out_frame(
+        [memoryview(frame)[header_size:] for frame in frames], sample_rate, channels
+    )
+
+
+async def receive_frame(ws) -> str | bytes:
+    # Like receive_text(), but binary frames come back as bytes instead of failing.
+    message = await ws.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    text = message.get("text")
+    return text if text is not None else message.get("bytes") or b""
+
+
+def decode_client_message(raw: str | bytes) -> Any:
+    # Text frames are JSON; binary frames are AUDIO_IN and decode to an "audio"
+    # message whose PCM is a view into the frame. Raises ValueError when invalid.
+    if isinstance(raw, str):
+        return json_loads(raw)
+    if len(raw) < AUDIO_HEADER.size or raw[0] != AUDIO_IN:
+        raise ValueError("Invalid audio frame.")
+    _, sample_rate, channels = AUDIO_HEADER.unpack_from(raw)
+    return {
+        "type": "audio",
+        "sampleRate": sample_rate,
+        "channels": channels,
+        "pcm": memoryview(raw)[AUDIO_HEADER.size :],
+    }
+
+
+def audio_payload(message: dict) -> bytes | memoryview:
+    # Binary frames carry raw PCM; JSON audio messages still send base64 "data".
+    pcm = message.get("pcm")
+    if pcm is not None:
+        return pcm
+    return b64decode(message.get("data", ""))
+
+
+def b64decode(data: str | bytes) -> bytes:
+    # pybase64 uses a SIMD codec; validate=False matches the stdlib default.
+    if pybase64 is not None:
+        return pybase64.b64decode(data, validate=False)
+    return base64.b64decode(data)
+
+
+def b64encode(data: bytes) -> str:
+    if pybase64 is not None:
+        return pybase64.b64encode_as_string(data)
+    # base64.b64encode is a Python wrapper around this same call.
+    return binascii.b2a_base64(data, newline=False).decode("ascii")
+
+
+def json_loads(raw: str | bytes) -> Any:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can catch either.
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def json_dumps(payload: Any) -> bytes:
+    # Sent as binary frames: no str round-trip here and no UTF-8 validation in the browser.
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")